@@ -1,25 +1,60 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
-load_dotenv()
+
+def _getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    # Puste wartości (np. "KEY=" albo samo "KEY" w .env) traktujemy jak brak
+    return os.getenv(name) or default
 
 
 class Config:
+    """
+    Konfiguracja z .env / zmiennych środowiskowych.
+    Wartości są dostępne dopiero po Config.load() - import modułu nie ma efektów ubocznych.
+    """
+
     # OpenAI
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+    OPENAI_API_KEY: Optional[str]
+    OPENAI_MODEL: str
 
     # Apify
-    APIFY_API_KEY = os.getenv("APIFY_API_KEY")
+    APIFY_API_KEY: Optional[str]
 
     # TrustCheck
-    TRUSTCHECK_API_URL = os.getenv("TRUSTCHECK_API_URL", "http://localhost:3001")
-    TRUSTCHECK_BOT_TOKEN = os.getenv("TRUSTCHECK_BOT_TOKEN")
+    TRUSTCHECK_API_URL: str
+    TRUSTCHECK_BOT_TOKEN: Optional[str]
+    # Dedupe screenshotów po SHA-256 - tylko jeśli backend ma GET /reports/screenshots/{sha256}
+    TRUSTCHECK_SCREENSHOT_DEDUPE: bool
 
     # Facebook
-    FACEBOOK_GROUP_URL = os.getenv("FACEBOOK_GROUP_URL", "https://www.facebook.com/groups/oszustwa")
+    FACEBOOK_GROUP_URL: str
 
     # Scraping
-    MAX_POSTS_PER_RUN = int(os.getenv("MAX_POSTS_PER_RUN", "50"))
-    CHECK_INTERVAL_HOURS = int(os.getenv("CHECK_INTERVAL_HOURS", "2"))
-    ONLY_POSTS_DAYS_BACK = int(os.getenv("ONLY_POSTS_DAYS_BACK", "2"))
+    MAX_POSTS_PER_RUN: int
+    CHECK_INTERVAL_HOURS: int
+    ONLY_POSTS_DAYS_BACK: int
+
+    @classmethod
+    def load(cls) -> None:
+        """
+        Wczytuje .env do os.environ (load_dotenv) i ustawia pola konfiguracji.
+        Eksport do os.environ jest celowy: SDK i requests czytają stamtąd własne
+        ustawienia (OPENAI_BASE_URL, APIFY_*, HTTPS_PROXY, REQUESTS_CA_BUNDLE, ...).
+        """
+        load_dotenv()
+
+        cls.OPENAI_API_KEY = _getenv("OPENAI_API_KEY")
+        cls.OPENAI_MODEL = _getenv("OPENAI_MODEL", "gpt-4o")
+
+        cls.APIFY_API_KEY = _getenv("APIFY_API_KEY")
+
+        cls.TRUSTCHECK_API_URL = _getenv("TRUSTCHECK_API_URL", "http://localhost:3001")
+        cls.TRUSTCHECK_BOT_TOKEN = _getenv("TRUSTCHECK_BOT_TOKEN")
+        cls.TRUSTCHECK_SCREENSHOT_DEDUPE = _getenv("TRUSTCHECK_SCREENSHOT_DEDUPE", "").lower() in ("1", "true", "yes")
+
+        cls.FACEBOOK_GROUP_URL = _getenv("FACEBOOK_GROUP_URL", "https://www.facebook.com/groups/oszustwa")
+
+        cls.MAX_POSTS_PER_RUN = int(_getenv("MAX_POSTS_PER_RUN", "50"))
+        cls.CHECK_INTERVAL_HOURS = int(_getenv("CHECK_INTERVAL_HOURS", "2"))
+        cls.ONLY_POSTS_DAYS_BACK = int(_getenv("ONLY_POSTS_DAYS_BACK", "2"))
@@ -4,13 +4,33 @@ TrustCheck Scraper Bot
 Automatycznie wykrywa oszustwa z grup Facebook i dodaje do bazy
 """
 
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
 import time
-import requests
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 from config import Config
-from modules.facebook_scraper import FacebookScraper
-from modules.vision_processor import VisionProcessor
-from modules.trustcheck_api import TrustCheckAPI
+
+# Ciężkie klienty (openai, apify_client, requests) importujemy leniwie,
+# żeby krótkie komendy startowały szybko
+if TYPE_CHECKING:
+    from modules.facebook_scraper import FacebookScraper
+    from modules.vision_processor import VisionProcessor
+    from modules.trustcheck_api import TrustCheckAPI
+
+# Do tej wielkości screenshot trzymany w pamięci, większe idą na dysk
+SCREENSHOT_SPOOL_MAX_MEMORY = 1024 * 1024
+
+# Kody wyjścia CLI (check: 0 = jest w bazie, 1 = brak; błędy zawsze 2)
+EXIT_OK = 0
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
 
 
 def map_scam_type_to_reason(scam_desc: str) -> str:
@@ -40,23 +60,44 @@ def calculate_rating(confidence: str) -> int:
 def download_and_upload_screenshot(image_url: str, post_id: str, idx: int, api: TrustCheckAPI) -> str:
     """
     Pobiera screenshot z FB i uploaduje na backend.
+    Obraz jest strumieniowany do pliku tymczasowego (liczymy SHA-256 po drodze),
+    a przy włączonym TRUSTCHECK_SCREENSHOT_DEDUPE upload pomijamy, jeśli backend
+    ma już plik o tym hashu.
     Zwraca ścieżkę do pliku na backendzie lub None.
     """
+    import requests
+    from modules.trustcheck_api import CHUNK_SIZE
+
     try:
-        # 1. Pobierz obrazek z FB
+        # 1. Pobierz obrazek z FB (strumieniowo)
         print(f"   ⬇️  Pobieranie screenshot...")
-        r = requests.get(image_url, timeout=20)
-        r.raise_for_status()
-
-        # 2. Sprawdź Content-Type
-        ct = (r.headers.get("Content-Type") or "").lower()
-        if not ct.startswith("image/"):
-            print(f"   ⚠️  Nie jest obrazkiem (Content-Type={ct})")
-            return None
-
-        # 3. Uploaduj na backend
-        print(f"   📤 Wysyłam na backend...")
-        backend_path = api.upload_screenshot(r.content, image_url)
+        with requests.get(image_url, timeout=20, stream=True) as r:
+            r.raise_for_status()
+
+            # 2. Sprawdź Content-Type
+            ct = (r.headers.get("Content-Type") or "").lower()
+            if not ct.startswith("image/"):
+                print(f"   ⚠️  Nie jest obrazkiem (Content-Type={ct})")
+                return None
+            mime = ct.split(";", 1)[0].strip()
+
+            with tempfile.SpooledTemporaryFile(max_size=SCREENSHOT_SPOOL_MAX_MEMORY) as buf:
+                digest = hashlib.sha256()
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    digest.update(chunk)
+                    buf.write(chunk)
+                sha256 = digest.hexdigest()
+
+                # 3. Pomiń upload, jeśli backend zna już ten plik
+                existing = api.find_screenshot_by_hash(sha256)
+                if existing:
+                    print(f"   ♻️  Już na backendzie: {existing}")
+                    return existing
+
+                # 4. Uploaduj na backend
+                print(f"   📤 Wysyłam na backend...")
+                buf.seek(0)
+                backend_path = api.upload_screenshot(buf, image_url, content_type=mime, sha256=sha256)
 
         if backend_path:
             print(f"   ✅ Zapisano: {backend_path}")
@@ -70,9 +111,11 @@ def download_and_upload_screenshot(image_url: str, post_id: str, idx: int, api:
         return None
 
 
-def process_post(post: dict, vision: VisionProcessor, api: TrustCheckAPI) -> bool:
+def process_post(post: dict, vision: VisionProcessor, api: Optional[TrustCheckAPI], dry_run: bool = False) -> bool:
     """
     Przetwarza pojedynczy post i dodaje zgłoszenia.
+    W trybie dry_run tylko wypisuje zgłoszenie (bez uploadu i wysyłki),
+    a bez api pomija też sprawdzanie duplikatów.
     """
     print(f"\n{'='*60}")
     print(f"📄 Post: {post.get('post_url')}")
@@ -130,13 +173,13 @@ def process_post(post: dict, vision: VisionProcessor, api: TrustCheckAPI) -> boo
             continue
 
         # Sprawdź duplikaty
-        if api.check_if_exists(target_value):
+        if api is not None and api.check_if_exists(target_value):
             print(f"⏭️  Pomijam - {target_value} już jest w bazie")
             continue
 
         # ===== UPLOAD SCREENSHOTU =====
         screenshot_path = None
-        if img_url:
+        if img_url and not dry_run:
             screenshot_path = download_and_upload_screenshot(
                 img_url, post.get("post_id"), idx, api
             )
@@ -164,6 +207,11 @@ def process_post(post: dict, vision: VisionProcessor, api: TrustCheckAPI) -> boo
             "sourceUrl": post.get("post_url"),
         }
 
+        if dry_run:
+            print("🧪 DRY RUN - zgłoszenie nie zostało wysłane:")
+            print(json.dumps(report_data, indent=2, ensure_ascii=False))
+            return True
+
         # Wyślij do TrustCheck
         success = api.submit_report(report_data)
 
@@ -174,7 +222,50 @@ def process_post(post: dict, vision: VisionProcessor, api: TrustCheckAPI) -> boo
     return False
 
 
-def main():
+def make_scraper() -> FacebookScraper:
+    if not Config.APIFY_API_KEY:
+        raise RuntimeError("❌ Brak APIFY_API_KEY w .env")
+    from modules.facebook_scraper import FacebookScraper
+
+    return FacebookScraper(Config.APIFY_API_KEY)
+
+
+def make_vision() -> VisionProcessor:
+    if not Config.OPENAI_API_KEY:
+        raise RuntimeError("❌ Brak OPENAI_API_KEY w .env")
+    from modules.vision_processor import VisionProcessor
+
+    return VisionProcessor(Config.OPENAI_API_KEY, model=Config.OPENAI_MODEL)
+
+
+def make_api() -> TrustCheckAPI:
+    if not Config.TRUSTCHECK_BOT_TOKEN:
+        raise RuntimeError("❌ Brak TRUSTCHECK_BOT_TOKEN w .env")
+    from modules.trustcheck_api import TrustCheckAPI
+
+    return TrustCheckAPI(
+        Config.TRUSTCHECK_API_URL,
+        Config.TRUSTCHECK_BOT_TOKEN,
+        screenshot_dedupe=Config.TRUSTCHECK_SCREENSHOT_DEDUPE,
+    )
+
+
+def load_posts(path: str) -> list[dict]:
+    """Wczytuje posty zapisane komendą `scrape`"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            posts = json.load(f)
+    except OSError as e:
+        raise RuntimeError(f"❌ {path}: nie można odczytać pliku ({e.strerror or str(e)})")
+    except ValueError as e:
+        # json.JSONDecodeError i UnicodeDecodeError dziedziczą po ValueError
+        raise RuntimeError(f"❌ {path}: niepoprawny JSON ({str(e)})")
+    if not isinstance(posts, list):
+        raise RuntimeError(f"❌ {path}: oczekiwano listy postów")
+    return posts
+
+
+def run_loop(args: argparse.Namespace) -> int:
     """Główna pętla scrapera"""
     print(
         """
@@ -185,19 +276,11 @@ def main():
 """
     )
 
-    # Walidacja konfiguracji
-    if not Config.APIFY_API_KEY:
-        raise RuntimeError("❌ Brak APIFY_API_KEY w .env")
-    if not Config.OPENAI_API_KEY:
-        raise RuntimeError("❌ Brak OPENAI_API_KEY w .env")
-    if not Config.TRUSTCHECK_BOT_TOKEN:
-        raise RuntimeError("❌ Brak TRUSTCHECK_BOT_TOKEN w .env")
-
-    # Inicjalizacja modułów
+    # Inicjalizacja modułów (waliduje konfigurację)
     print("🔧 Inicjalizacja...")
-    fb_scraper = FacebookScraper(Config.APIFY_API_KEY)
-    vision = VisionProcessor(Config.OPENAI_API_KEY, model=Config.OPENAI_MODEL)
-    api = TrustCheckAPI(Config.TRUSTCHECK_API_URL, Config.TRUSTCHECK_BOT_TOKEN)
+    fb_scraper = make_scraper()
+    vision = make_vision()
+    api = make_api()
 
     print("✅ Gotowe!\n")
 
@@ -237,19 +320,132 @@ def main():
             print(f"   Następne skanowanie za {Config.CHECK_INTERVAL_HOURS}h")
             print(f"{'='*60}\n")
 
+            if args.once:
+                return EXIT_OK
+
             # Czekaj do następnego cyklu
             time.sleep(Config.CHECK_INTERVAL_HOURS * 3600)
 
         except KeyboardInterrupt:
             print("\n\n👋 Zatrzymano scraper. Do zobaczenia!")
-            break
+            return EXIT_OK
         except Exception as e:
             print(f"\n❌ Błąd krytyczny: {str(e)}")
             import traceback
             traceback.print_exc()
+            if args.once:
+                return EXIT_ERROR
             print("⏸️  Czekam 5 minut przed ponowną próbą...")
             time.sleep(300)
 
 
+def scrape_to_file(args: argparse.Namespace) -> int:
+    """Scrapuje grupę raz i zapisuje posty do pliku JSON (do późniejszego dry-run)"""
+    fb_scraper = make_scraper()
+    posts = fb_scraper.scrape_group_posts(
+        Config.FACEBOOK_GROUP_URL,
+        max_posts=Config.MAX_POSTS_PER_RUN,
+        days_back=Config.ONLY_POSTS_DAYS_BACK,
+    )
+    # scrape_group_posts zwraca [] także przy błędzie Apify - nie nadpisujemy wtedy
+    # poprzednio zapisanych postów
+    if not posts:
+        print(f"❌ Brak postów (błąd scrapowania?) - nie nadpisuję {args.out}", file=sys.stderr)
+        return EXIT_ERROR
+
+    # Zapis przez plik tymczasowy, żeby przerwany zapis nie zostawił uciętego JSON-a
+    tmp_path = f"{args.out}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(posts, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, args.out)
+    except (OSError, TypeError, ValueError) as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        print(f"❌ Nie udało się zapisać {args.out}: {str(e)}", file=sys.stderr)
+        return EXIT_ERROR
+    print(f"💾 Zapisano {len(posts)} postów do {args.out}")
+    return EXIT_OK
+
+
+def check_value(args: argparse.Namespace) -> int:
+    """Sprawdza czy wartość jest już w bazie (exit code 0 = jest, 1 = brak, 2 = błąd)"""
+    api = make_api()
+    try:
+        total = api.count_reports(args.value)
+    except Exception as e:
+        # Błąd połączenia / API to nie to samo co brak w bazie
+        print(f"❌ Nie udało się sprawdzić {args.value}: {str(e)}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if total > 0:
+        print(f"✅ {args.value} już jest w bazie ({total} zgłoszeń)")
+        return EXIT_OK
+    print(f"➖ {args.value} nie ma w bazie")
+    return EXIT_NOT_FOUND
+
+
+def dry_run(args: argparse.Namespace) -> int:
+    """Przetwarza zapisane posty bez uploadu i wysyłania zgłoszeń"""
+    from modules.facebook_scraper import FacebookScraper
+
+    posts = FacebookScraper.filter_posts_with_screenshots(load_posts(args.posts_file))
+    vision = make_vision()
+    api = make_api() if args.check_duplicates else None
+
+    matched = sum(1 for post in posts if process_post(post, vision, api, dry_run=True))
+    print(f"\n📊 Zgłoszeń do wysłania: {matched}/{len(posts)}")
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="TrustCheck Scraper Bot - wykrywa oszustwa z grup Facebook i dodaje do bazy"
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    p_run = sub.add_parser("run", help="główna pętla scrapera (domyślnie)")
+    p_run.add_argument("--once", action="store_true", help="jeden cykl skanowania zamiast pętli")
+    p_run.set_defaults(func=run_loop)
+
+    p_scrape = sub.add_parser("scrape", help="scrapuje grupę raz i zapisuje posty do pliku JSON")
+    p_scrape.add_argument("-o", "--out", default="posts.json", help="plik wyjściowy (domyślnie posts.json)")
+    p_scrape.set_defaults(func=scrape_to_file)
+
+    p_check = sub.add_parser("check", help="sprawdza czy wartość (telefon, email, ...) jest już w bazie")
+    p_check.add_argument("value")
+    p_check.set_defaults(func=check_value)
+
+    p_dry = sub.add_parser("dry-run", help="analizuje zapisane posty bez wysyłania zgłoszeń")
+    p_dry.add_argument("posts_file", help="plik JSON z komendy `scrape`")
+    p_dry.add_argument("--check-duplicates", action="store_true", help="sprawdzaj duplikaty w TrustCheck")
+    p_dry.set_defaults(func=dry_run)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Bez komendy zachowujemy dotychczasowe zachowanie: główna pętla
+    if args.command is None:
+        args = parser.parse_args(["run"])
+
+    try:
+        Config.load()
+    except ValueError as e:
+        print(f"❌ Błędna konfiguracja w .env: {str(e)}", file=sys.stderr)
+        return EXIT_ERROR
+
+    try:
+        return args.func(args)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_ERROR
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,4 +1,3 @@
-from apify_client import ApifyClient
 from typing import List, Dict
 from datetime import datetime, timedelta
 import json
@@ -6,6 +5,9 @@ import json
 
 class FacebookScraper:
     def __init__(self, api_key: str):
+        # Import leniwy - apify_client jest ciężki, a nie każda komenda go potrzebuje
+        from apify_client import ApifyClient
+
         self.client = ApifyClient(api_key)
 
     def _extract_image_urls(self, item: dict) -> list[str]:
@@ -90,7 +92,8 @@ class FacebookScraper:
             traceback.print_exc()
             return []
 
-    def filter_posts_with_screenshots(self, posts: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def filter_posts_with_screenshots(posts: List[Dict]) -> List[Dict]:
         filtered = [post for post in posts if isinstance(post.get("images"), list) and len(post["images"]) > 0]
         print(f"📸 Posty ze screenshotami: {len(filtered)}/{len(posts)}")
         return filtered
@@ -1,12 +1,76 @@
 import requests
-from typing import Dict, Optional
+from typing import BinaryIO, Dict, Iterator, Optional, Union
 from urllib.parse import quote
 import io
+import os
+import uuid
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _screenshot_filename(content_type: str) -> str:
+    ext = {
+        "image/jpeg": "jpg",
+        "image/png": "png",
+        "image/webp": "webp",
+        "image/gif": "gif",
+    }.get(content_type, "jpg")
+    return f"screenshot.{ext}"
+
+
+class _MultipartStream:
+    """
+    Body multipart/form-data generowane w kawałkach z otwartego pliku.
+    Ma __len__, więc requests wyśle Content-Length zamiast chunked encoding.
+    Każda iteracja zaczyna od pozycji startowej pliku, więc body można wysłać
+    ponownie (redirect 307/308, retry adaptera).
+    """
+
+    def __init__(self, fields: Dict[str, str], fileobj: BinaryIO, filename: str, content_type: str):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.fileobj = fileobj
+
+        head = b""
+        for name, value in fields.items():
+            head += (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode("utf-8")
+        head += (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self.head = head
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+        self.start = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        self.file_size = fileobj.tell() - self.start
+        fileobj.seek(self.start)
+
+    def __len__(self) -> int:
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.fileobj.seek(self.start)
+        yield self.head
+        while True:
+            chunk = self.fileobj.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        yield self.tail
 
 
 class TrustCheckAPI:
-    def __init__(self, api_url: str, bot_token: str):
+    def __init__(self, api_url: str, bot_token: str, screenshot_dedupe: bool = False):
         self.api_url = api_url.rstrip("/")
+        # Dedupe screenshotów po SHA-256 wymaga wsparcia backendu (patrz find_screenshot_by_hash)
+        self.screenshot_dedupe = screenshot_dedupe
         self.headers = {
             "Authorization": f"Bearer {bot_token}",
         }
@@ -32,23 +96,68 @@ class TrustCheckAPI:
             print(f"❌ Błąd połączenia z API: {str(e)}")
             return False
 
-    def upload_screenshot(self, file_content: bytes, original_url: str) -> Optional[str]:
+    def find_screenshot_by_hash(self, sha256: str) -> Optional[str]:
+        """
+        Sprawdza czy backend ma już screenshot o danym hashu (SHA-256).
+        Zwraca ścieżkę istniejącego pliku lub None.
+
+        Wymaga od backendu (włączane przez TRUSTCHECK_SCREENSHOT_DEDUPE):
+        - GET /reports/screenshots/{sha256} -> 200 {"path": "uploads/..."} gdy plik jest,
+          204 gdy go nie ma,
+        - pola "sha256" w multipart /reports/upload-screenshot (zapis hasha przy uploadzie).
+        Odpowiedź 404/405 oznacza brak endpointu - dedupe zostaje wyłączony do końca działania.
+        """
+        if not self.screenshot_dedupe:
+            return None
+
+        endpoint = f"{self.api_url}/reports/screenshots/{quote(sha256, safe='')}"
+
+        try:
+            response = requests.get(endpoint, headers=self.headers_json, timeout=10)
+            if response.status_code == 200:
+                return response.json().get("path")
+            if response.status_code == 204:
+                return None
+            if response.status_code in (404, 405):
+                print(f"⚠️  Backend nie obsługuje dedupe screenshotów ({response.status_code}) - wyłączam")
+                self.screenshot_dedupe = False
+                return None
+
+            print(f"⚠️  Błąd sprawdzania hasha screenshotu ({response.status_code})")
+            return None
+        except Exception as e:
+            print(f"⚠️  Błąd sprawdzania hasha screenshotu: {str(e)}")
+            return None
+
+    def upload_screenshot(
+        self,
+        file_content: Union[bytes, BinaryIO],
+        original_url: str,
+        content_type: str = "image/jpeg",
+        sha256: Optional[str] = None,
+    ) -> Optional[str]:
         """
         Uploaduje screenshot na backend i zwraca ścieżkę.
+        Przyjmuje bytes albo otwarty plik (strumieniowany w kawałkach, bez kopii w pamięci).
+        Pole "sha256" wysyłamy tylko przy włączonym dedupe (patrz find_screenshot_by_hash).
         """
         endpoint = f"{self.api_url}/reports/upload-screenshot"
 
         try:
-            # Przygotuj multipart form
-            files = {
-                "file": ("screenshot.jpg", io.BytesIO(file_content), "image/jpeg")
-            }
+            if isinstance(file_content, (bytes, bytearray)):
+                file_content = io.BytesIO(file_content)
+
+            fields = {}
+            if sha256 and self.screenshot_dedupe:
+                fields["sha256"] = sha256
+
+            # Multipart budowany strumieniowo (requests czyta całe pliki do pamięci)
+            body = _MultipartStream(fields, file_content, _screenshot_filename(content_type), content_type)
 
-            # Uploaduj (bez Authorization header w headers_json, bo to multipart)
             response = requests.post(
                 endpoint,
-                files=files,
-                headers={"Authorization": f"Bearer {self.headers['Authorization'].split(' ')[1]}"},
+                data=body,
+                headers={**self.headers, "Content-Type": body.content_type},
                 timeout=30
             )
 
@@ -63,22 +172,30 @@ class TrustCheckAPI:
             print(f"⚠️  Błąd uploadowania: {str(e)}")
             return None
 
-    def check_if_exists(self, target_value: str) -> bool:
+    def count_reports(self, target_value: str) -> int:
         """
-        Sprawdza czy dane już istnieją w bazie.
+        Zwraca liczbę zgłoszeń dla danej wartości.
+        W przeciwieństwie do check_if_exists nie połyka błędów: problem z połączeniem
+        albo odpowiedź inna niż 200 kończy się wyjątkiem.
         """
         safe = quote(target_value, safe="")
         endpoint = f"{self.api_url}/verification/search/{safe}"
 
+        response = requests.get(
+            endpoint,
+            headers=self.headers_json,
+            timeout=10
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Błąd API ({response.status_code}): {response.text[:200]}")
+        data = response.json()
+        return data.get("community", {}).get("totalReports", 0)
+
+    def check_if_exists(self, target_value: str) -> bool:
+        """
+        Sprawdza czy dane już istnieją w bazie.
+        """
         try:
-            response = requests.get(
-                endpoint,
-                headers=self.headers_json,
-                timeout=10
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("community", {}).get("totalReports", 0) > 0
-            return False
+            return self.count_reports(target_value) > 0
         except Exception:
             return False
@@ -3,11 +3,13 @@ import json
 import re
 from typing import Dict, Optional, Any
 import requests
-from openai import OpenAI
 
 
 class VisionProcessor:
     def __init__(self, api_key: str, model: str = "gpt-4o"):
+        # Import leniwy - openai jest ciężki, a nie każda komenda go potrzebuje
+        from openai import OpenAI
+
         self.client = OpenAI(api_key=api_key)
         self.model = model
 